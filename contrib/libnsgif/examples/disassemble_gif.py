@@ -1,5 +1,11 @@
+import mmap
 import sys
 
+# Rendered dump cell for every byte value: hex pair, then the quoted
+# character if it is printable ASCII
+CELL = [(f"{c:02x} '{chr(c)}' " if 32 <= c <= 126 else f"{c:02x}     ").encode()
+        for c in range(256)]
+
 def main():
     if len(sys.argv) != 2:
         sys.exit(f"Usage: {sys.argv[0]} IMAGE")
@@ -7,35 +13,41 @@ def main():
     image_path = sys.argv[1]
     try:
         with open(image_path, 'rb') as f:
-            gif_data = f.read()
+            try:
+                # Pages are faulted in as the disassembler walks forward
+                gif_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                gif_data = b''
     except FileNotFoundError:
         sys.exit(f"{sys.argv[0]}: open {image_path}: No such file or directory")
 
-    print(f"{image_path}: {len(gif_data)} bytes\n")
+    # Everything is collected here and handed to stdout in one write
+    out = bytearray(image_path.encode())
+    out += f": {len(gif_data)} bytes\n\n".encode('ascii')
 
     z = 0
 
     def output_chunk(description, length):
-        nonlocal z
-        print(description, end='')
-        for i in range(length):
-            if i % 8 == 0:
-                print(f"\n{z + i:8}:  ", end='')
-            
-            if z + i >= len(gif_data):
-                print("EOF\n\nUnexpected end of file")
-                sys.exit()
-            
-            c = gif_data[z + i]
-            print(f"{c:02x} ", end='')
-            if 32 <= c <= 126:
-                print(f"'{chr(c)}'", end='')
-            else:
-                print("   ", end='')
-            print(" ", end='')
-        
-        print("\n")
-        z += length
+        nonlocal z, out
+        out += description.encode('ascii')
+        end = z + length
+        avail = min(end, len(gif_data))
+
+        # One line per 8 bytes, each byte rendered by a table lookup
+        for pos in range(z, avail, 8):
+            out += f"\n{pos:8}:  ".encode('ascii')
+            out += b''.join(map(CELL.__getitem__, gif_data[pos:min(pos + 8, avail)]))
+
+        if end > len(gif_data):
+            if (avail - z) % 8 == 0:
+                out += f"\n{avail:8}:  ".encode('ascii')
+            out += b"EOF\n\nUnexpected end of file\n"
+            sys.stdout.buffer.write(out)
+            sys.exit()
+
+        out += b"\n\n"
+        z = end
 
     output_chunk('Header', 6)
     output_chunk('Logical Screen Descriptor', 7)
@@ -118,5 +130,10 @@ def main():
     if z != len(gif_data):
         output_chunk('*** Junk on End ***', len(gif_data) - z)
 
+    sys.stdout.buffer.write(out)
+
+    if isinstance(gif_data, mmap.mmap):
+        gif_data.close()
+
 if __name__ == "__main__":
     main()
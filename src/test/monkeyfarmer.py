@@ -26,6 +26,8 @@ Python code.
 
 # pylint: disable=locally-disabled, missing-docstring
 
+import heapq
+import itertools
 import threading
 import os
 import socket
@@ -34,29 +36,15 @@ import time
 import errno
 import sys
 
-class StderrEcho(threading.Thread):
-    def __init__(self, stream):
-        super().__init__(daemon=True)
-        self.stream = stream
-        self.start()
-
-    def run(self):
-        while True:
-            line = self.stream.readline()
-            if not line:
-                break
-            try:
-                s = line.decode('utf-8')
-            except UnicodeDecodeError:
-                print("WARNING: Unicode decode error")
-                s = line.decode('utf-8', 'replace')
-            sys.stderr.write("{}".format(s))
-
-class StdoutReader(threading.Thread):
-    def __init__(self, stream, on_line):
+# Hands each line read from one of nsmonkey's pipes to on_line.  Blocking
+# reader threads are used rather than a selector because selectors cannot
+# wait on subprocess pipes on Windows.
+class PipeReader(threading.Thread):
+    def __init__(self, stream, on_line, on_close=None):
         super().__init__(daemon=True)
         self.stream = stream
         self.on_line = on_line
+        self.on_close = on_close
         self.start()
 
     def run(self):
@@ -64,12 +52,16 @@ class StdoutReader(threading.Thread):
             line = self.stream.readline()
             if not line:
                 break
-            try:
-                s = line.decode('utf-8')
-            except UnicodeDecodeError:
-                s = line.decode('utf-8', 'replace')
-            sys.stderr.write("{}".format(s))
             self.on_line(line)
+        if self.on_close is not None:
+            self.on_close()
+
+
+def handler_table(obj, prefix):
+    # Map message tokens to obj's bound prefix+token methods, so dispatch
+    # is a dict lookup rather than a string concat and getattr per line
+    return {name[len(prefix):]: getattr(obj, name)
+            for name in dir(obj) if name.startswith(prefix)}
 
 
 class MonkeyFarmer:
@@ -86,6 +78,8 @@ class MonkeyFarmer:
             sys.stderr.write("       Use a valid path, e.g. build-ninja\\frontends\\monkey\\nsmonkey.exe\n")
             raise FileNotFoundError(exe_path)
 
+        # Buffered pipes let the reader threads' readline() pull whole chunks
+        # instead of one byte per read; stdin is written via its fd directly
         try:
             self.monkey = subprocess.Popen(
                 monkey_cmd,
@@ -93,7 +87,7 @@ class MonkeyFarmer:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                bufsize=0)
+                bufsize=65536)
         except FileNotFoundError as e:
             sys.stderr.write("ERROR: Failed to launch nsmonkey: {}\n".format(e))
             sys.stderr.write("       Command: {}\n".format(repr(monkey_cmd)))
@@ -103,32 +97,52 @@ class MonkeyFarmer:
         self.stdout = self.monkey.stdout
         self.stderr = self.monkey.stderr
 
-        self.err_echo = StderrEcho(self.stderr)
-        self.stdout_reader = StdoutReader(self.stdout, self._on_stdout_line)
-
-        self.buffer = b""
+        self.buffer = bytearray()
         self.incoming = b""
         self.lines = []
-        self.scheduled = []
+        # Signalled by the reader thread when a line arrives or stdout closes
+        self.wakeup = threading.Condition()
+        self.quiet = quiet
+
+        self.err_echo = PipeReader(self.stderr, self._on_stderr_line)
+        self.stdout_reader = PipeReader(self.stdout, self._on_stdout_line, self._on_stdout_close)
+        self.scheduled = []  # heap of (when, seq, event)
+        self._schedule_seq = itertools.count()
         self.deadmonkey = False
         self.online = online
-        self.quiet = quiet
         self.discussion = []
         self.maybe_slower = wrapper is not None
 
+    def _echo(self, line):
+        # Lines are passed through to our stderr as raw bytes; the text
+        # layer is flushed first so output written through it stays ordered
+        sys.stderr.flush()
+        sys.stderr.buffer.write(line)
+        sys.stderr.buffer.flush()
+
+    def _on_stderr_line(self, line):
+        self._echo(line)
+
     def _on_stdout_line(self, line):
-        self.lines.append(line)
+        if not self.quiet:
+            self._echo(line)
+        with self.wakeup:
+            self.lines.append(line)
+            self.wakeup.notify()
+
+    def _on_stdout_close(self):
+        with self.wakeup:
+            self.wakeup.notify()
 
     def _pump_stdin(self):
+        # Commands queued by tell_monkey() since the last pump go out in a
+        # single write straight to the pipe, bypassing any buffering layer
         if len(self.buffer) > 0:
             try:
-                sent = self.stdin.write(self.buffer)
-                self.stdin.flush()
-                if sent is not None:
-                    self.buffer = self.buffer[sent:]
-                else:
-                    self.buffer = b""
-            except BrokenPipeError:
+                sent = os.write(self.stdin.fileno(), self.buffer)
+                del self.buffer[:sent]
+            except OSError:
+                # BrokenPipeError, or EINVAL from a closed pipe on Windows
                 self.deadmonkey = True
 
     def tell_monkey(self, *args):
@@ -136,8 +150,10 @@ class MonkeyFarmer:
         if not self.quiet:
             print(">>> {}".format(cmd))
         self.discussion.append((">", cmd))
-        cmd = cmd + "\n"
+        # Encoded straight onto the pending bytes rather than building a
+        # "cmd\n" string first
         self.buffer += cmd.encode('utf-8')
+        self.buffer += b"\n"
 
     def monkey_says(self, line):
         try:
@@ -154,11 +170,13 @@ class MonkeyFarmer:
         assert secs is not None or when is not None
         if when is None:
             when = time.time() + secs
-        self.scheduled.append((when, event))
-        self.scheduled.sort()
+        # The sequence number keeps equal times in FIFO order and stops
+        # heapq from ever comparing the event callables themselves
+        heapq.heappush(self.scheduled, (when, next(self._schedule_seq), event))
 
     def unschedule_event(self, event):
-        self.scheduled = [x for x in self.scheduled if x[1] != event]
+        self.scheduled = [x for x in self.scheduled if x[2] != event]
+        heapq.heapify(self.scheduled)
 
     def loop(self, once=False):
         if len(self.lines) > 0:
@@ -168,8 +186,7 @@ class MonkeyFarmer:
         while not self.deadmonkey:
             now = time.time()
             while len(self.scheduled) > 0 and now >= self.scheduled[0][0]:
-                func = self.scheduled[0][1]
-                self.scheduled.pop(0)
+                _, _, func = heapq.heappop(self.scheduled)
                 func(self)
                 now = time.time()
             self._pump_stdin()
@@ -181,17 +198,25 @@ class MonkeyFarmer:
                 self.monkey_says(self.lines.pop(0))
                 if once or self.deadmonkey:
                     return
-            timeout = 0.01
+            # Sleep until the reader delivers a line or the next event is
+            # due; the cap bounds how long an exit can go unnoticed
+            timeout = 0.05
             if len(self.scheduled) > 0:
                 next_event = self.scheduled[0][0]
-                timeout = max(0.0, min(next_event - now, 0.05))
-            time.sleep(timeout)
+                timeout = max(0.0, min(next_event - now, timeout))
+            with self.wakeup:
+                if len(self.lines) == 0:
+                    self.wakeup.wait(timeout)
 
 
 class Browser:
 
     # pylint: disable=locally-disabled, too-many-instance-attributes, dangerous-default-value, invalid-name
 
+    # Messages whose trailing fields are handed on as one unsplit string,
+    # keyed by the number of leading fields split off first
+    split_limits = {"WINDOW": 3, "LOGIN": 3}
+
     def __init__(self, monkey_cmd=["./nsmonkey"], monkey_env=None, quiet=False, *, wrapper=None):
         self.farmer = MonkeyFarmer(
             monkey_cmd=monkey_cmd,
@@ -199,6 +224,7 @@ class Browser:
             online=self.on_monkey_line,
             quiet=quiet,
             wrapper=wrapper)
+        self.handlers = handler_table(self, "handle_")
         self.windows = {}
         self.logins = {}
         self.current_draw_target = None
@@ -228,10 +254,13 @@ class Browser:
             self.farmer.tell_monkey("OPTIONS " + (" ".join(['--' + opt for opt in opts])))
 
     def on_monkey_line(self, line):
-        parts = line.strip().split(" ")
-        handler = getattr(self, "handle_" + parts[0], None)
+        what, _, rest = line.strip().partition(" ")
+        handler = self.handlers.get(what)
         if handler is not None:
-            handler(*parts[1:])
+            if rest:
+                handler(*rest.split(" ", self.split_limits.get(what, -1)))
+            else:
+                handler()
 
     def quit(self):
         self.farmer.tell_monkey("QUIT")
@@ -262,27 +291,27 @@ class Browser:
         else:
             pass
 
-    def handle_WINDOW(self, action, _win, winid, *args):
+    def handle_WINDOW(self, action, _win, winid, args=""):
         if action == "NEW":
-            new_win = BrowserWindow(self, winid, *args)
+            new_win = BrowserWindow(self, winid, *args.split(" "))
             self.windows[winid] = new_win
         else:
             win = self.windows.get(winid, None)
             if win is None:
                 print("    Unknown window id {}".format(winid))
             else:
-                win.handle(action, *args)
+                win.handle(action, args)
 
-    def handle_LOGIN(self, action, _lwin, winid, *args):
+    def handle_LOGIN(self, action, _lwin, winid, args=""):
         if action == "OPEN":
-            new_win = LoginWindow(self, winid, *args)
+            new_win = LoginWindow(self, winid, *args.split(" ", 1))
             self.logins[winid] = new_win
         else:
             win = self.logins.get(winid, None)
             if win is None:
                 print("    Unknown login window id {}".format(winid))
             else:
-                win.handle(action, *args)
+                win.handle(action, *args.split(" ", 1))
                 if win.alive and win.ready:
                     self.handle_ready_login(win)
 
@@ -313,18 +342,17 @@ class LoginWindow:
 
     # pylint: disable=locally-disabled, too-many-instance-attributes, invalid-name
 
-    def __init__(self, browser, winid, _url, *url):
+    def __init__(self, browser, winid, _url, url=""):
         self.alive = True
         self.ready = False
         self.browser = browser
         self.winid = winid
-        self.url = " ".join(url)
+        self.url = url
         self.username = None
         self.password = None
         self.realm = None
 
-    def handle(self, action, _str="STR", *rest):
-        content = " ".join(rest)
+    def handle(self, action, _str="STR", content=""):
         if action == "USER":
             self.username = content
         elif action == "PASS":
@@ -369,6 +397,10 @@ class BrowserWindow:
 
     # pylint: disable=locally-disabled, too-many-instance-attributes, too-many-public-methods, invalid-name
 
+    # Actions whose trailing text is handed on as one unsplit string,
+    # keyed by the number of leading fields split off first
+    split_limits = {"TITLE": 1, "SET_STATUS": 1, "CONSOLE_LOG": 4}
+
     def __init__(
             self,
             browser,
@@ -405,6 +437,7 @@ class BrowserWindow:
         self.plotting = False
         self.log_entries = []
         self.page_info_state = "UNKNOWN"
+        self.handlers = handler_table(self, "handle_window_")
 
     def kill(self):
         self.browser.farmer.tell_monkey("WINDOW DESTROY %s" % self.winid)
@@ -443,10 +476,13 @@ class BrowserWindow:
     def js_exec(self, src):
         self.browser.farmer.tell_monkey("WINDOW EXEC WIN %s %s" % (self.winid, src))
 
-    def handle(self, action, *args):
-        handler = getattr(self, "handle_window_" + action, None)
+    def handle(self, action, args=""):
+        handler = self.handlers.get(action)
         if handler is not None:
-            handler(*args)
+            if args:
+                handler(*args.split(" ", self.split_limits.get(action, -1)))
+            else:
+                handler()
 
     def handle_window_SIZE(self, _width, width, _height, height):
         self.width = int(width)
@@ -455,8 +491,8 @@ class BrowserWindow:
     def handle_window_DESTROY(self):
         self.alive = False
 
-    def handle_window_TITLE(self, _str, *title):
-        self.title = " ".join(title)
+    def handle_window_TITLE(self, _str, title=""):
+        self.title = title
 
     def handle_window_GET_DIMENSIONS(self, _width, width, _height, height):
         self.width = width
@@ -490,8 +526,8 @@ class BrowserWindow:
         self.content_width = int(width)
         self.content_height = int(height)
 
-    def handle_window_SET_STATUS(self, _str, *status):
-        self.status = (" ".join(status))
+    def handle_window_SET_STATUS(self, _str, status=""):
+        self.status = status
 
     def handle_window_SET_POINTER(self, _ptr, ptr):
         self.pointer = ptr
@@ -519,8 +555,8 @@ class BrowserWindow:
             self.browser.current_draw_target = None
             self.plotting = False
 
-    def handle_window_CONSOLE_LOG(self, _src, src, folding, level, *msg):
-        self.log_entries.append((src, folding == "FOLDABLE", level, " ".join(msg)))
+    def handle_window_CONSOLE_LOG(self, _src, src, folding, level, msg=""):
+        self.log_entries.append((src, folding == "FOLDABLE", level, msg))
 
     def handle_window_PAGE_STATUS(self, _status, status):
         self.page_info_state = status
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import sys
 import os
+import mmap
 
 def convert_eol(input_path, output_path):
     """
@@ -10,22 +11,36 @@ def convert_eol(input_path, output_path):
     """
     try:
         with open(input_path, 'rb') as f:
-            content = f.read()
-
-        # Strip UTF-8 BOM if present
-        if content.startswith(b'\xef\xbb\xbf'):
-            content = content[3:]
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Strip UTF-8 BOM if present
+                    start = 3 if mm[:3] == b'\xef\xbb\xbf' else 0
+                    # Files from Unix checkouts have no CR at all; a single
+                    # memchr over the mapping lets them skip EOL conversion
+                    has_cr = mm.find(b'\r', start) != -1
+                    content = mm[start:]
+            except ValueError:
+                # Empty files cannot be mapped
+                content = b''
+                has_cr = False
 
         # Convert CRLF to LF
-        content = content.replace(b'\r\n', b'\n')
+        if has_cr:
+            content = content.replace(b'\r\n', b'\n')
 
         # Trim trailing whitespace on each line
         lines = content.split(b'\n')
         lines = [ln.rstrip(b' \t') for ln in lines]
         content = b'\n'.join(lines)
 
-        with open(output_path, 'wb') as f:
-            f.write(content)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(output_path, flags, 0o666)
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
 
     except Exception as e:
         print("Error converting EOL: {}".format(e))
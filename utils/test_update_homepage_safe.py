@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the comment-aware replacement in update_homepage_safe.
+
+Pins what each comment style rewrites and what it leaves alone.
+
+Run with: python -m pytest utils/test_update_homepage_safe.py -v
+Or:       python utils/test_update_homepage_safe.py
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from update_homepage_safe import process_file_content
+
+
+class TestCStyle(unittest.TestCase):
+    """C-style files: // and /* */ comments."""
+
+    def _process(self, content):
+        return process_file_content(content, 'c')[0]
+
+    def test_line_comment_untouched(self):
+        text = 'int x; // see netsurf-browser.org\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_block_comment_untouched(self):
+        text = '/* netsurf-browser.org */ int x;\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_string_rewritten(self):
+        self.assertEqual(
+            self._process('char *u = "http://www.netsurf-browser.org/";\n'),
+            'char *u = "http://www.wispbrowser.com/";\n')
+
+    def test_comment_after_url_string_untouched(self):
+        self.assertEqual(
+            self._process('u = "http://netsurf-browser.org"; // netsurf-browser.org\n'),
+            'u = "http://wispbrowser.com"; // netsurf-browser.org\n')
+
+    def test_comment_marker_inside_string(self):
+        self.assertEqual(
+            self._process('s = "a // b netsurf-browser.org";\n'),
+            's = "a // b wispbrowser.com";\n')
+
+    def test_block_comment_opened_after_inline_comment(self):
+        text = 'x; /* a */ y; /* open\nnetsurf-browser.org\n*/\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_unterminated_block_comment_runs_to_eof(self):
+        text = 'x; /* open\nnetsurf-browser.org\nwisp-browser\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_email_kept(self):
+        text = 'mail = "dev@netsurf-browser.org";\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_case_insensitive_and_project_name(self):
+        self.assertEqual(
+            self._process('a = "NeoSurf-Browser.ORG"; b = "wisp-browser";\n'),
+            'a = "wispbrowser.com"; b = "wispbrowser";\n')
+
+    def test_unicode_case_fold(self):
+        # U+017F LONG S matches 's' under IGNORECASE but survives lower()
+        self.assertEqual(
+            self._process('x = "netſurf-browser.org";\n'),
+            'x = "wispbrowser.com";\n')
+
+    def test_changed_flag(self):
+        self.assertEqual(process_file_content('// netsurf-browser.org\n', 'c'),
+                         ('// netsurf-browser.org\n', False))
+        self.assertEqual(process_file_content('x = netsurf-browser.org;\n', 'c'),
+                         ('x = wispbrowser.com;\n', True))
+
+
+class TestPyStyle(unittest.TestCase):
+    """Python-style files: # comments."""
+
+    def _process(self, content):
+        return process_file_content(content, 'py')[0]
+
+    def test_comment_untouched(self):
+        self.assertEqual(
+            self._process('URL = "https://netsurf-browser.org"  # netsurf-browser.org\n'),
+            'URL = "https://wispbrowser.com"  # netsurf-browser.org\n')
+
+    def test_hash_inside_string(self):
+        self.assertEqual(
+            self._process('s = "#" + "netsurf-browser.org"\nt = "a # netsurf-browser.org"\n'),
+            's = "#" + "wispbrowser.com"\nt = "a # wispbrowser.com"\n')
+
+    def test_email_kept(self):
+        text = 'MAIL = "dev@netsurf-browser.org"\n'
+        self.assertEqual(self._process(text), text)
+
+
+class TestHtmlStyle(unittest.TestCase):
+    """HTML-style files: <!-- --> comments."""
+
+    def _process(self, content):
+        return process_file_content(content, 'html')[0]
+
+    def test_comment_untouched(self):
+        self.assertEqual(
+            self._process('<a href="http://netsurf-browser.org">x</a><!-- netsurf-browser.org -->\n'),
+            '<a href="http://wispbrowser.com">x</a><!-- netsurf-browser.org -->\n')
+
+    def test_multiline_comment_after_inline_comment(self):
+        text = '<!-- a --> <!-- open\nnetsurf-browser.org\n-->\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_unterminated_comment_runs_to_eof(self):
+        text = '<p>x</p><!-- open\nnetsurf-browser.org\n'
+        self.assertEqual(self._process(text), text)
+
+    def test_email_kept(self):
+        text = '<a href="mailto:dev@netsurf-browser.org">dev</a>\n'
+        self.assertEqual(self._process(text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
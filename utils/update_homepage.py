@@ -8,49 +8,89 @@ Rules:
 3. Constraint: Do NOT change if preceded by '@' (email address).
 """
 
+import mmap
 import os
 import re
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 
 # Regex: negative lookbehind for @, then the domain
 DOMAIN_REGEX = re.compile(r'(?<!@)\b(?:netsurf|neosurf|wisp)-browser\.org\b', re.IGNORECASE)
+# Literal every match must contain; scanned on the raw mapped bytes to reject
+# files before reading them in (a case-insensitive literal is a fast scan)
+CANDIDATE_REGEX = re.compile(rb'-browser\.org', re.IGNORECASE)
+COPYRIGHT_REGEX = re.compile(r'copyright', re.IGNORECASE)
 
 def is_copyright_line(line):
-    return 'copyright' in line.lower()
+    return COPYRIGHT_REGEX.search(line) is not None
 
 def process_file(path, dry_run=False):
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        original = f.read()
-    
-    lines = original.splitlines(keepends=True)
-    new_lines = []
-    changes = False
-    
-    for line in lines:
-        if is_copyright_line(line):
-            new_lines.append(line)
-            continue
-            
-        new_line = DOMAIN_REGEX.sub('wispbrowser.com', line)
-        if new_line != line:
-            changes = True
-        new_lines.append(new_line)
-        
-    if changes:
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped and have nothing to update
+            return
+        with mm:
+            # Most files never mention the old domains
+            if not CANDIDATE_REGEX.search(mm):
+                return
+            raw = mm[:]
+
+    original = raw.decode('utf-8', errors='ignore')
+
+    if not is_copyright_line(original):
+        # No line needs protecting, so one pass over the whole text will do
+        updated = DOMAIN_REGEX.sub('wispbrowser.com', original)
+    else:
+        new_lines = []
+        for line in original.splitlines(keepends=True):
+            if is_copyright_line(line):
+                new_lines.append(line)
+            else:
+                new_lines.append(DOMAIN_REGEX.sub('wispbrowser.com', line))
+        updated = ''.join(new_lines)
+
+    if updated != original:
         print(f"Updating: {os.path.relpath(path)}")
         if not dry_run:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(''.join(new_lines))
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(updated)
+
+# Directory or file names that are never visited
+IGNORED_NAMES = {'.git', 'build', 'build-ninja', 'build-gcc', '__pycache__'}
+# The rewrite tools and their tests spell out the old domains on purpose
+SELF_NAMES = {'update_homepage.py', 'update_homepage_safe.py', 'test_update_homepage_safe.py'}
 
-def should_ignore(path):
-    parts = path.split(os.sep)
-    if '.git' in parts: return True
-    if 'build' in parts: return True
-    if 'build-ninja' in parts: return True
-    if 'build-gcc' in parts: return True
-    if '__pycache__' in parts: return True
-    if 'utils' in parts and 'update_homepage.py' in parts: return True
-    return False
+def iter_files(root_dir):
+    """Yield the files under root_dir, pruning hidden and ignored directories."""
+    stack = [(root_dir, False)]
+    while stack:
+        dir_path, in_utils = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            continue
+        with it:
+            for entry in it:
+                if entry.name in IGNORED_NAMES:
+                    continue
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not descended
+                    if not entry.name.startswith('.') and not entry.is_symlink():
+                        stack.append((entry.path, in_utils or entry.name == 'utils'))
+                elif not (in_utils and entry.name in SELF_NAMES):
+                    yield entry.path
+
+def process_path(path, dry_run=False):
+    """Worker entry point: process one file, returning an error message on failure."""
+    try:
+        process_file(path, dry_run)
+    except Exception as e:
+        return f"Error processing {os.path.relpath(path)}: {e}"
+    return None
 
 def main():
     parser = argparse.ArgumentParser()
@@ -59,20 +99,14 @@ def main():
     
     root_dir = os.getcwd()
     
-    for root, dirs, files in os.walk(root_dir):
-        # Prune dirs
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        if 'build' in dirs: dirs.remove('build')
-        
-        for file in files:
-            full_path = os.path.join(root, file)
-            if should_ignore(full_path):
-                continue
-                
-            try:
-                process_file(full_path, args.dry_run)
-            except Exception as e:
-                print(f"Error processing {os.path.relpath(full_path)}: {e}")
+    paths = list(iter_files(root_dir))
+
+    # Files are independent, so fan them out across all cores
+    worker = functools.partial(process_path, dry_run=args.dry_run)
+    with ProcessPoolExecutor() as executor:
+        for error in executor.map(worker, paths, chunksize=64):
+            if error is not None:
+                print(error)
 
 if __name__ == '__main__':
     main()
@@ -7,10 +7,18 @@ Rules:
 2. COMMENTS: Do NOT touch anything. Returns exact original text.
 """
 
+import mmap
 import os
 import re
+import stat
+import tempfile
 import argparse
+import json
 import sys
+import collections
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 
 # Extensions mapping to comment style
 EXT_MAP = {
@@ -28,14 +36,31 @@ EXT_MAP = {
     '.html': 'html', '.xml': 'html', '.svg': 'html', '.htm': 'html'
 }
 
-# Regex for replacements
+# Regex for replacements, one alternative per name. Full domains are tried
+# before the bare project name; the match's ending picks its replacement.
 # 1. wisp-browser.org (or netsurf/neosurf) -> wispbrowser.com
-#    Avoid emails: (?<!@)
-RE_DOMAIN = re.compile(r'(?<!@)\b(?:wisp-browser|netsurf-browser|neosurf-browser)\.org\b', re.IGNORECASE)
-
 # 2. wisp-browser -> wispbrowser (generic, if not covered above)
-#    Avoid emails.
-RE_PROJECT_NAME = re.compile(r'(?<!@)\bwisp-browser\b', re.IGNORECASE)
+# Avoid emails: (?<!@)
+RE_TOKEN = re.compile(
+    r'(?<!@)\b(?:wisp-browser\.org|netsurf-browser\.org|neosurf-browser\.org|wisp-browser)\b',
+    re.IGNORECASE)
+
+# Literal every match of the pattern above contains; files whose mapped
+# bytes lack it are skipped without parsing (a case-insensitive literal is
+# a fast scan)
+CANDIDATE_REGEX = re.compile(rb'-browser', re.IGNORECASE)
+
+# Files larger than this are reported and left alone
+MAX_BYTES = 8 << 20
+# A NUL byte in this many leading bytes marks a file as binary
+BINARY_SNIFF_BYTES = 8192
+
+def replace_name(match):
+    # Decided from the ending rather than a table of the old names: the
+    # match may use Unicode case-folds ('ſ' for 's') that lower() keeps
+    if match.group()[-4:].lower() == '.org':
+        return 'wispbrowser.com'
+    return 'wispbrowser'
 
 def replace_token(text):
     """
@@ -43,13 +68,13 @@ def replace_token(text):
     """
     original = text
     
-    # First replace full domains
-    text = RE_DOMAIN.sub("wispbrowser.com", text)
+    # Every name contains '-browser'; most code spans lack it, and a plain
+    # substring test is much cheaper than a regex pass
+    if '-browser' not in text.lower():
+        return text
     
-    # Then replace generic project name if lingering
-    text = RE_PROJECT_NAME.sub("wispbrowser", text)
-    
-    return text
+    # Domains and the generic project name are replaced in a single pass
+    return RE_TOKEN.sub(replace_name, text)
 
 def process_code_part(text):
     """
@@ -64,163 +89,215 @@ def process_comment_text(text):
     """
     return text
 
-def process_file_content(content, ext):
+# Whole-file scanners, one per comment style. A match is either a comment,
+# copied through untouched, or code that may need replacing: a string
+# literal (matched whole so comment markers inside it are not taken for
+# comments) or one of the names above. Unterminated block comments run to
+# the end of the file. The leading lookahead lists every character a match
+# can start with, which lets the engine skip other positions quickly.
+TOKENS = RE_TOKEN.pattern
+STRINGS = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+RE_C_STYLE = re.compile(
+    r'(?=[/"\'nw])(?:(?P<comment>/\*.*?(?:\*/|\Z)|//[^\n]*)|' + STRINGS + '|' + TOKENS + ')',
+    re.IGNORECASE | re.DOTALL)
+RE_PY_STYLE = re.compile(
+    r'(?=[#"\'nw])(?:(?P<comment>#[^\n]*)|"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|'
+    + STRINGS + '|' + TOKENS + ')',
+    re.IGNORECASE)
+RE_HTML_STYLE = re.compile(
+    r'(?=[<nw])(?:(?P<comment><!--.*?(?:-->|\Z))|' + TOKENS + ')',
+    re.IGNORECASE | re.DOTALL)
+
+STYLE_REGEXES = {'c': RE_C_STYLE, 'py': RE_PY_STYLE, 'html': RE_HTML_STYLE}
+
+def replace_match(match):
+    if match.lastgroup == 'comment':
+        return process_comment_text(match.group())
+    return process_code_part(match.group())
+
+def has_code_token(style_regex, content):
+    """
+    Check whether any code span (not a comment) may need replacing.
+    """
+    for match in style_regex.finditer(content):
+        if match.lastgroup is None and '-browser' in match.group().lower():
+            return True
+    return False
+
+def comment_style(name):
     """
-    Parse content based on extension and apply rules.
+    Pick the comment style for a file from its name.
+    """
+    name = name.lower()
+    if name in ('makefile', 'cmakelists.txt', 'dockerfile'):
+        return 'py'
+    return EXT_MAP.get(os.path.splitext(name)[1], 'c') # Default to C-style for unknown
+
+def process_file_content(content, style):
+    """
+    Parse content in the given comment style and apply rules.
     Returns (new_content, changed_bool)
     """
-    style = EXT_MAP.get(ext, 'c') # Default to C-style for unknown
-    if os.path.basename(ext).lower() in ['makefile', 'cmakelists.txt', 'dockerfile']:
-        style = 'py'
-    
-    lines = content.splitlines(keepends=True)
-    new_lines = []
-    changes_made = False
-    
-    in_block_comment = False
-    
-    for line in lines:
-        original_line = line
+    style_regex = STYLE_REGEXES.get(style)
+    if style_regex is not None:
+        # The old names often appear only in comments, e.g. licence headers;
+        # a scan that builds no output is enough to rule those files out
+        if not has_code_token(style_regex, content):
+            return content, False
+        new_content = style_regex.sub(replace_match, content)
+    else:
+        # For generic files, we don't know comment style, so we process as code.
+        new_content = replace_token(content)
         
-        if style == 'c':
-            line, in_block_comment = process_c_line(line, in_block_comment)
-        elif style == 'py':
-            line = process_py_line(line)
-        elif style == 'html':
-            line, in_block_comment = process_html_line(line, in_block_comment)
-        else:
-            line = process_generic_line(line)
-            
-        if line != original_line:
-            changes_made = True
-            
-        new_lines.append(line)
-        
-    return ''.join(new_lines), changes_made
+    return new_content, new_content != content
 
-def process_c_line(line, in_block_comment):
-    # If we are inside a /* ... */ block
-    if in_block_comment:
-        if '*/' in line:
-            # End of block
-            pre, post = line.split('*/', 1)
-            new_pre = process_comment_text(pre + '*/')
-            new_post, still_in_block = process_c_line(post, False) 
-            return new_pre + new_post, still_in_block
-        else:
-            # Still in block comment
-            return process_comment_text(line), True
+# Per-file results from the last run, kept in the directory being updated
+CACHE_NAME = '.homepage_safe_cache.json'
 
-    # Check for //
-    if '//' in line:
-        idx = line.find('//')
-        # Check valid comment quotes check
-        pre_comment = line[:idx]
-        if pre_comment.count('"') % 2 == 0 and pre_comment.count("'") % 2 == 0:
-            # It IS a comment
-            code_part = pre_comment
-            comment_part = line[idx:]
-            
-            new_code = process_code_part(code_part)
-            new_comment = process_comment_text(comment_part)
-            return new_code + new_comment, False
+# Directory or file names that are never visited
+IGNORED_NAMES = frozenset({'.git', 'build', 'build-ninja', 'build-gcc', '__pycache__', 'node_modules',
+                           CACHE_NAME})
+LICENSE_PREFIXES = ('COPYING', 'LICENSE', 'licence', 'License')
+# This script and its test under utils spell out the old domains on purpose
+SELF_NAMES = frozenset({'update_homepage_safe.py', 'test_update_homepage_safe.py'})
 
-    # Check for /* (Start of block)
-    if '/*' in line:
-        idx = line.find('/*')
-        pre_comment = line[:idx]
-        if pre_comment.count('"') % 2 == 0 and pre_comment.count("'") % 2 == 0:
-            code_part = pre_comment
-            rest = line[idx:]
-            
-            # Does it end on same line?
-            if '*/' in rest:
-                # /* ... */ inline
-                comment_end_idx = rest.find('*/') + 2
-                comment_part = rest[:comment_end_idx]
-                rem_code = rest[comment_end_idx:]
-                
-                new_code = process_code_part(code_part)
-                new_comment = process_comment_text(comment_part)
-                # Recurse for the remainder
-                new_rem, _ = process_c_line(rem_code, False)
-                return new_code + new_comment + new_rem, False
-            else:
-                # Starts block comment
-                new_code = process_code_part(code_part)
-                new_comment = process_comment_text(rest)
-                return new_code + new_comment, True
+def should_ignore(path, filename):
+    if filename in SELF_NAMES and 'utils' in path.split(os.sep):
+        return True
+    return filename.startswith(LICENSE_PREFIXES)
 
-    # Code only
-    return replace_token(line), False
+def file_key(entry):
+    """
+    Return [mtime_ns, size] identifying a file's current content,
+    or None if it cannot be stat'ed.
+    """
+    try:
+        st = entry.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
 
-def process_py_line(line):
-    # Python style: # comments
-    if '#' in line:
-        idx = line.find('#')
-        pre_comment = line[:idx]
-        # Quote check
-        if pre_comment.count('"') % 2 == 0 and pre_comment.count("'") % 2 == 0:
-            code_part = pre_comment
-            comment_part = line[idx:]
-            
-            new_code = process_code_part(code_part)
-            new_comment = process_comment_text(comment_part)
-            return new_code + new_comment
-            
-    return replace_token(line)
+def scan_dir(path, is_root=False):
+    """
+    List one directory.
+    Returns (files, subdirs): the (path, name, key) triples to check and the
+    directories to descend.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name in IGNORED_NAMES:
+                    continue
+                if entry.name == 'CMakeCache.txt' and not is_root:
+                    # A CMake build tree, whatever it is called; none of
+                    # its files or subdirectories are sources. The root is
+                    # exempt, as an in-source configure puts one there.
+                    return [], []
+                if entry.is_dir():
+                    # Like os.walk, symlinked directories are not descended
+                    if not entry.name.startswith('.') and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif not should_ignore(entry.path, entry.name):
+                    files.append((entry.path, entry.name, file_key(entry)))
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        pass
+    return files, subdirs
 
-def process_html_line(line, in_block_comment):
-    # HTML comments <!-- ... -->
-    if in_block_comment:
-        if '-->' in line:
-            pre, post = line.split('-->', 1)
-            new_pre = process_comment_text(pre + '-->')
-            new_post, still_in_block = process_html_line(post, False)
-            return new_pre + new_post, still_in_block
-        else:
-            return process_comment_text(line), True
+def iter_targets(root_dir):
+    """
+    Yield (path, name, key) for the files to check under root_dir.
+    Directories are listed on a thread pool so their I/O overlaps.
+    """
+    with ThreadPoolExecutor() as executor:
+        pending = collections.deque([executor.submit(scan_dir, root_dir, True)])
+        while pending:
+            files, subdirs = pending.popleft().result()
+            pending.extend(executor.submit(scan_dir, d) for d in subdirs)
+            yield from files
 
-    if '<!--' in line:
-        idx = line.find('<!--')
-        code_part = line[:idx]
-        rest = line[idx:]
-        
-        if '-->' in rest:
-            end_idx = rest.find('-->') + 3
-            comment_part = rest[:end_idx]
-            rem_code = rest[end_idx:]
-            
-            new_code = process_code_part(code_part)
-            new_comment = process_comment_text(comment_part)
-            new_rem, _ = process_html_line(rem_code, False)
-            return new_code + new_comment + new_rem, False
-        else:
-            new_code = process_code_part(code_part)
-            new_comment = process_comment_text(rest)
-            return new_code + new_comment, True
-            
-    return replace_token(line), False
+def check_file(target, dry_run=False):
+    """
+    Worker entry point: read, process and (unless dry_run) rewrite one
+    (path, name) target.
+    Returns (file_path, changed_bool, error or None).
+    """
+    file_path, name = target
+    changed = False
+    try:
+        with open(file_path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped and have nothing to update
+                return file_path, False, None
+            with mm:
+                if len(mm) > MAX_BYTES:
+                    return file_path, False, f"larger than {MAX_BYTES >> 20} MiB"
+                if mm.find(b'\x00', 0, BINARY_SNIFF_BYTES) != -1:
+                    return file_path, False, None
+                if not CANDIDATE_REGEX.search(mm):
+                    return file_path, False, None
+                # Decode as UTF-8 straight from the mapping
+                content = str(mm, 'utf-8', 'ignore')
+                has_cr = mm.find(b'\r') != -1
 
-def process_generic_line(line):
-    # For generic files, we don't know comment style, so we process as code.
-    # But usually these are docs or similar.
-    return replace_token(line)
+        # Same newline translation as text mode, for the few files that need it
+        if has_cr:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
 
-def should_ignore(path):
-    parts = path.split(os.sep)
-    if '.git' in parts: return True
-    if 'build' in parts: return True
-    if 'build-ninja' in parts: return True
-    if 'build-gcc' in parts: return True
-    if '__pycache__' in parts: return True
-    if 'utils' in parts and 'update_homepage_safe.py' in parts: return True
-    
-    filename = os.path.basename(path)
-    if filename.startswith('COPYING') or filename.startswith('LICENSE') or filename.startswith('licence'):
-        return True
-        
-    return False
+        new_content, changed = process_file_content(content, comment_style(name))
+        if changed and not dry_run:
+            write_file(file_path, new_content)
+    except Exception as e:
+        return file_path, changed, str(e)
+    return file_path, changed, None
+
+def write_file(file_path, content):
+    """
+    Replace a file's content atomically, via a sibling temporary file.
+    """
+    # Write through symlinks to the file they point at, as open() would
+    file_path = os.path.realpath(file_path)
+    # A unique name, so neither an existing sibling file nor another worker
+    # writing the same target through a symlink is clobbered
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path),
+                                    prefix='.' + os.path.basename(file_path) + '.')
+    try:
+        try:
+            view = memoryview(content.encode('utf-8'))
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        # Keep the original permission bits, e.g. on executable scripts
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_cache(cache_path, rules_key):
+    """
+    Load the paths found clean by the last run, as {path: key}.
+    The cache is dropped if this script has changed since it was written.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('rules') != rules_key:
+        return {}
+    return cache.get('files', {})
+
+def save_cache(cache_path, rules_key, files):
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'rules': rules_key, 'files': files}, f)
+    os.replace(tmp_path, cache_path)
 
 def main():
     parser = argparse.ArgumentParser()
@@ -229,37 +306,42 @@ def main():
     
     root_dir = os.getcwd()
     
-    targets = []
-    for root, dirs, files in os.walk(root_dir):
-        # prune directories
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        if 'build' in dirs: dirs.remove('build')
-        
-        for file in files:
-            full_path = os.path.join(root, file)
-            if not should_ignore(full_path):
-                targets.append(full_path)
+    targets = list(iter_targets(root_dir))
     
     print(f"Checking {len(targets)} files...")
     
-    for file_path in targets:
-        try:
-            # Attempt to read as UTF-8
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
-            ext = os.path.splitext(file_path)[1].lower()
-            if os.path.basename(file_path) == 'Makefile': ext = 'makefile'
-            
-            new_content, changed = process_file_content(content, ext)
-            
+    # Files whose mtime and size match a clean result from the last run are
+    # not read again
+    cache_path = os.path.join(root_dir, CACHE_NAME)
+    script_stat = os.stat(__file__)
+    rules_key = [script_stat.st_mtime_ns, script_stat.st_size]
+    cache = load_cache(cache_path, rules_key)
+    clean = {}
+    keys = {}
+    pending = []
+    for file_path, name, key in targets:
+        if key is not None and cache.get(file_path) == key:
+            clean[file_path] = key
+        else:
+            keys[file_path] = key
+            pending.append((file_path, name))
+    if clean:
+        print(f"{len(clean)} files unchanged since the last run")
+    
+    # Files are independent, so they are fanned out across all cores; each
+    # worker writes its own changes, and results are reported as they arrive
+    worker = functools.partial(check_file, dry_run=args.dry_run)
+    with multiprocessing.Pool() as pool:
+        for file_path, changed, error in pool.imap_unordered(worker, pending, chunksize=64):
             if changed:
                 print(f"Modified: {os.path.relpath(file_path)}")
-                if not args.dry_run:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-        except Exception as e:
-            print(f"Skipping {os.path.relpath(file_path)}: {e}")
+            if error is not None:
+                print(f"Skipping {os.path.relpath(file_path)}: {error}")
+            elif not changed and keys[file_path] is not None:
+                clean[file_path] = keys[file_path]
+    
+    if not args.dry_run:
+        save_cache(cache_path, rules_key, clean)
 
 if __name__ == '__main__':
     main()